@@ -3,10 +3,19 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
+import plotly.io as pio
+import re
 import warnings
 
 warnings.filterwarnings('ignore')
 
+# Serialisasi figure lewat orjson (C-backed), jauh lebih cepat dari encoder JSON bawaan Plotly
+try:
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = 'orjson'
+except ImportError:
+    pass
+
 # Konfigurasi halaman Streamlit
 st.set_page_config(
     page_title="Customer Intelligence Hub",
@@ -15,27 +24,53 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# float32/int8 cukup untuk presisi yang ditampilkan, dan separuh bandwidth memori dibanding default 64-bit
+RFM_DTYPES = {
+    'Recency': np.float32,
+    'Frequency': np.float32,
+    'Monetary': np.float32,
+    'AvgOrderValue': np.float32,
+    'RFM_Score': np.float32,
+    'Cluster_KMeans': np.int8
+}
+
+# Hanya kolom yang dipakai dashboard yang di-parse, langsung dengan dtype akhirnya (tanpa inferensi tipe per kolom)
+def read_segments_csv(path):
+    index_col = pd.read_csv(path, nrows=0).columns[0]
+    return pd.read_csv(
+        path,
+        index_col=index_col,
+        usecols=lambda col: col == index_col or col in RFM_DTYPES,
+        dtype=RFM_DTYPES
+    )
+
 # Load & Prepare Data
-@st.cache_data
+# Data statis disimpan sebagai cache_resource: satu objek dibagi semua rerun/sesi tanpa salinan (unpickle)
+# tiap rerun. Fungsi turunan menerima _rfm (berawalan _) supaya DataFrame tidak di-hash ulang setiap rerun
+@st.cache_resource
 def load_data():
     try:
-        rfm = pd.read_csv('final_customer_segments (1).csv', index_col=0)
+        rfm = read_segments_csv('final_customer_segments (1).csv')
     except:
         try:
-            rfm = pd.read_csv('final_customer_segments.csv', index_col=0)
+            rfm = read_segments_csv('final_customer_segments.csv')
         except:
             # Create sample data if file not found
             st.error("Data file not found. Using sample data for demonstration.")
-            np.random.seed(42)
+            # Satu Generator (PCG64) untuk semua kolom, bukan RandomState global yang lama
+            rng = np.random.default_rng(42)
             n_samples = 1000
+            # Kolom langsung dibuat dengan dtype akhirnya (RFM_DTYPES), jadi tidak ada salinan int64/float64 sementara
             rfm = pd.DataFrame({
-                'Recency': np.random.randint(1, 365, n_samples),
-                'Frequency': np.random.randint(1, 50, n_samples),
-                'Monetary': np.random.uniform(100, 50000, n_samples),
-                'AvgOrderValue': np.random.uniform(50, 500, n_samples),
-                'RFM_Score': np.random.randint(100, 600, n_samples),
-                'Cluster_KMeans': np.random.choice([0, 1, 2, 3, 4, 5], n_samples, p=[0.2, 0.1, 0.15, 0.1, 0.25, 0.2])
-            })
+                'Recency': rng.integers(1, 365, n_samples, dtype=np.int16).astype(RFM_DTYPES['Recency']),
+                'Frequency': rng.integers(1, 50, n_samples, dtype=np.int16).astype(RFM_DTYPES['Frequency']),
+                'Monetary': rng.uniform(100, 50000, n_samples).astype(RFM_DTYPES['Monetary']),
+                'AvgOrderValue': rng.uniform(50, 500, n_samples).astype(RFM_DTYPES['AvgOrderValue']),
+                'RFM_Score': rng.integers(100, 600, n_samples, dtype=np.int16).astype(RFM_DTYPES['RFM_Score']),
+                'Cluster_KMeans': rng.choice(
+                    np.arange(6, dtype=RFM_DTYPES['Cluster_KMeans']), n_samples, p=[0.2, 0.1, 0.15, 0.1, 0.25, 0.2]
+                )
+            }, copy=False)
             rfm.index = [f'CUST_{i:04d}' for i in range(n_samples)]
     
     # Ensure required columns exist
@@ -47,9 +82,31 @@ def load_data():
             else:
                 rfm[col] = 0  # Default value
     
-    return rfm
+    # Urutan kemunculan cluster di file disimpan dulu: profil, kartu strategi & dropdown tetap tampil dalam urutan ini
+    cluster_order = tuple(rfm['Cluster_KMeans'].unique())
+    
+    # Urutkan per cluster supaya baris satu segmen bersebelahan di memori (filter segmen = slice)
+    # astype(copy=False) tidak menyalin kolom yang dtype-nya sudah sesuai; sort_values sudah membuat salinan sendiri
+    return rfm.astype(RFM_DTYPES, copy=False).sort_values('Cluster_KMeans', kind='stable'), cluster_order
 
-rfm = load_data()
+rfm, cluster_order = load_data()
+
+# Data Summary menampilkan semua kolom file (skor R/F/M, label DBSCAN/Agglomerative, dll.) dengan dtype aslinya.
+# Dibaca terpisah & baru saat expander dirender pertama kali, jadi load_data tetap hanya mem-parse kolom dashboard
+@st.cache_resource
+def load_summary_data(_rfm):
+    try:
+        full = pd.read_csv('final_customer_segments (1).csv', index_col=0)
+    except:
+        try:
+            full = pd.read_csv('final_customer_segments.csv', index_col=0)
+        except:
+            # Data contoh tidak punya kolom tambahan
+            return _rfm
+    if 'Cluster_KMeans' not in full.columns:
+        return full
+    # Urutan baris disamakan dengan rfm (sort stabil per cluster) supaya mask filter langsung berlaku
+    return full.iloc[np.argsort(full['Cluster_KMeans'].to_numpy(), kind='stable')]
 
 # Cluster Strategies
 strats = {
@@ -61,6 +118,16 @@ strats = {
     'standard': {'name':'📊 Standard','grad':'linear-gradient(135deg,#89f7fe,#66a6ff,#4a6fff)','color':'#89f7fe','priority':'MEDIUM','strategy':'Steady Engage','tactics':['📧 Newsletters','🎯 Seasonal','💌 AI Recs','🎁 Surprises','📱 Community'],'kpis':['Engage>40%','Stable','Sat>3.5/5'],'budget':'5%','roi':'150%'}
 }
 
+# Aturan pemetaan rata-rata RFM cluster ke strategi, dicek berurutan (aturan pertama yang cocok dipakai).
+# Operator & (bukan and) supaya aturan bisa dievaluasi sekaligus untuk semua cluster
+STRAT_RULES = (
+    ('champions', lambda r, f, m: (r < 50) & (f > 10) & (m > 1000)),
+    ('loyal', lambda r, f, m: (r < 50) & (f > 5)),
+    ('big', lambda r, f, m: m > 1500),
+    ('dormant', lambda r, f, m: r > 100),
+    ('potential', lambda r, f, m: (r < 50) & (f < 5)),
+)
+
 # Champion Sub-segments Explanation
 champion_details = {
     1: {'tier':'Platinum Elite','desc':'Super frequent buyers with highest engagement','char':'11d recency, 15.6 orders, £5,425 spend'},
@@ -69,52 +136,187 @@ champion_details = {
     6: {'tier':'Diamond Elite','desc':'Ultra frequent buyers with exceptional loyalty','char':'1d recency, 126.8 orders, £33,796 spend'}
 }
 
-def get_strat(cid, data):
-    cd = data[data['Cluster_KMeans'] == cid]
-    if len(cd) == 0:
-        return {**strats['standard'], 'cluster_id': cid}
-    
-    r = cd['Recency'].mean() if 'Recency' in cd.columns else 100
-    f = cd['Frequency'].mean() if 'Frequency' in cd.columns else 5
-    m = cd['Monetary'].mean() if 'Monetary' in cd.columns else 500
-    
-    if pd.isna(r) or pd.isna(f) or pd.isna(m):
-        s = 'standard'
-    elif r < 50 and f > 10 and m > 1000: 
-        s = 'champions'
-    elif r < 50 and f > 5: 
-        s = 'loyal'
-    elif m > 1500: 
-        s = 'big'
-    elif r > 100: 
-        s = 'dormant'
-    elif r < 50 and f < 5: 
-        s = 'potential'
-    else: 
-        s = 'standard'
-    return {**strats[s], 'cluster_id': cid}
+# Satu groupby untuk rata-rata R/F/M semua cluster, lalu semua cluster diklasifikasi sekaligus dengan np.select
+# sort=False: data sudah diurutkan per cluster di load_data, jadi urutan grup tetap sama tanpa sort ulang
+def get_strats(data):
+    means = data.groupby('Cluster_KMeans', sort=False)[['Recency', 'Frequency', 'Monetary']].mean()
+    r, f, m = (means[col].to_numpy() for col in ('Recency', 'Frequency', 'Monetary'))
+    valid = ~(np.isnan(r) | np.isnan(f) | np.isnan(m))
+    keys = np.select(
+        [valid & rule(r, f, m) for _, rule in STRAT_RULES],
+        [key for key, _ in STRAT_RULES],
+        default='standard'
+    )
+    return {cid: {**strats[s], 'key': s, 'cluster_id': cid} for cid, s in zip(means.index, keys)}
 
-# Inisialisasi profs dan colors
-@st.cache_data
-def init_data(rfm):
-    profs = {}
-    for c in rfm['Cluster_KMeans'].unique():
-        p = get_strat(c, rfm)
-        profs[c] = p
-        rfm.loc[rfm['Cluster_KMeans'] == c, 'Cluster_Label'] = f"{p['name']} (C{c})"
-        rfm.loc[rfm['Cluster_KMeans'] == c, 'Priority'] = p['priority']
-    
-    colors = {}
+# Inisialisasi profs dan warna segmen
+@st.cache_resource
+def init_data(_rfm, _cluster_order):
+    rfm = _rfm
+    strategies = get_strats(rfm)
+    profs = {c: strategies[c] for c in _cluster_order}
+    
+    # Label segmen dibangun sekali dan disimpan di profil; dipakai ulang untuk kategori dan warna
     for c, p in profs.items():
-        label = f"{p['name']} (C{c})"
-        colors[label] = p['color']
+        p['label'] = f"{p['name']} (C{c})"
+    label_map = {c: p['label'] for c, p in profs.items()}
+    # Disimpan sebagai category: kode int8 + kamus label, groupby/value_counts jalan di atas kode.
+    # Kategori diurutkan sesuai id cluster dan kodenya diambil langsung dari Cluster_KMeans (tanpa hashing string)
+    cluster_ids = np.array(sorted(profs))
+    rfm['Cluster_Label'] = pd.Categorical.from_codes(
+        np.searchsorted(cluster_ids, rfm['Cluster_KMeans'].to_numpy()),
+        categories=[label_map[c] for c in cluster_ids]
+    )
+    rfm['Priority'] = rfm['Cluster_KMeans'].map({c: p['priority'] for c, p in profs.items()}).astype('category')
     
-    return profs, colors, rfm
+    # Warna diurutkan sesuai kode kategori (urutan id cluster), jadi lookup warna cukup dengan index kode
+    label_colors = np.array([profs[c]['color'] for c in cluster_ids], dtype=object)
+    
+    return profs, label_colors, rfm
+
+profs, label_colors, rfm = init_data(rfm, cluster_order)
+
+# Render HTML kartu strategi sekali per segmen; profs statis, jadi tidak perlu dibangun ulang tiap rerun
+def render_strategy_card(p):
+    tactics_html = "".join(f'<div class="tactic-item">{tactic}</div>' for tactic in p['tactics'])
+    kpis_html = "".join(f'<div class="kpi-item">{kpi}</div>' for kpi in p['kpis'])
+    return f"""
+                <div class="strategy-card" style="background: {p['grad']}">
+                    <div class="strategy-header">
+                        <div>
+                            <h3 class="strategy-name">{p['name']}</h3>
+                            <div class="strategy-subtitle">{p['strategy']} Strategy</div>
+                        </div>
+                        <div class="priority-badge">{p['priority']}</div>
+                    </div>
+                    
+                    <div class="tactics-section">
+                        <div class="tactics-title">🎯 Key Tactics</div>
+                        <div class="tactics-grid">
+                            {tactics_html}
+                        </div>
+                    </div>
+                    
+                    <div class="tactics-section">
+                        <div class="tactics-title">📊 Target KPIs</div>
+                        <div class="kpis-grid">
+                            {kpis_html}
+                        </div>
+                    </div>
+                    
+                    <div class="strategy-footer">
+                        <div class="budget-item">
+                            <div class="budget-label">Budget Allocation</div>
+                            <div class="budget-value">{p['budget']}</div>
+                        </div>
+                        <div class="budget-item">
+                            <div class="budget-label">Expected ROI</div>
+                            <div class="budget-value">{p['roi']}</div>
+                        </div>
+                    </div>
+                </div>
+                """
+
+# Dibangun di dalam cache_resource: kode level modul dijalankan ulang tiap rerun, fungsi ber-cache tidak.
+# _profs berawalan _ supaya dict profil tidak di-hash; profs sendiri sudah statis per proses (init_data)
+@st.cache_resource
+def build_strategy_cards(_profs):
+    strategy_cards = {cid: render_strategy_card(p) for cid, p in _profs.items()}
+    return strategy_cards, "".join(strategy_cards.values())
+
+strategy_cards, all_strategy_cards_html = build_strategy_cards(profs)
 
-profs, colors, rfm = init_data(rfm)
+# Cluster champion cukup dicari dari profs (beberapa cluster saja); per rerun tinggal cek apakah slice cluster-nya lolos filter
+champion_cluster_ids = sorted(c for c, p in profs.items() if p['key'] == 'champions')
+
+# Opsi dropdown filter (value -> label); format_func cukup lookup dict, bukan scan list tiap opsi.
+# Opsi segmen bergantung pada profs, jadi dibangun sekali per proses lewat cache_resource
+@st.cache_resource
+def build_segment_options(_profs):
+    options = {'all': '🌐 All Segments'}
+    for c, p in _profs.items():
+        if p['key'] == 'champions' and c in champion_details:
+            options[c] = f"{p['name']} - {champion_details[c]['tier']}"
+        else:
+            options[c] = p['name']
+    return options
+
+SEGMENT_OPTIONS = build_segment_options(profs)
+
+PRIORITY_OPTIONS = {
+    'all': '🌐 All Priorities',
+    'CRITICAL': '🔴 CRITICAL',
+    'URGENT': '🔥 URGENT',
+    'HIGH': '⚡ HIGH',
+    'MEDIUM': '📊 MEDIUM'
+}
+
+# Array NumPy per kolom (SoA) untuk filter & agregasi tanpa groupby pandas
+@st.cache_resource
+def build_arrays(_rfm):
+    rfm = _rfm
+    arrays = {col: rfm[col].to_numpy() for col in ['Recency', 'Frequency', 'Monetary', 'AvgOrderValue', 'RFM_Score', 'Cluster_KMeans']}
+    arrays['label_codes'] = rfm['Cluster_Label'].cat.codes.to_numpy()
+    # Priority difilter lewat kode kategori int8, bukan perbandingan string per baris
+    arrays['priority_codes'] = rfm['Priority'].cat.codes.to_numpy()
+    priority_codes = {p: i for i, p in enumerate(rfm['Priority'].cat.categories)}
+    
+    # rfm sudah terurut per cluster: posisi awal/akhir tiap cluster cukup dicari sekali dengan searchsorted
+    clusters = arrays['Cluster_KMeans']
+    cluster_bounds = {
+        c: (int(np.searchsorted(clusters, c, side='left')), int(np.searchsorted(clusters, c, side='right')))
+        for c in np.unique(clusters)
+    }
+    return arrays, rfm['Cluster_Label'].cat.categories.to_numpy(), cluster_bounds, priority_codes
+
+arrays, label_names, cluster_bounds, priority_codes = build_arrays(rfm)
+CHART_COLUMNS = ('Recency', 'Frequency', 'Monetary', 'AvgOrderValue', 'RFM_Score', 'Cluster_KMeans')
+
+# Histogram memakai batas bin tetap dari data penuh: index bin tiap baris dihitung sekali,
+# filter berikutnya cukup np.bincount di atas index tersebut (tanpa binning ulang)
+HISTOGRAM_BINS = 30
+
+@st.cache_resource
+def build_histogram_bins(_rfm):
+    rfm = _rfm
+    edges, bin_index = {}, {}
+    for col in ('Recency', 'Frequency', 'Monetary'):
+        values = rfm[col].to_numpy()
+        col_edges = np.histogram_bin_edges(values[~np.isnan(values)], bins=HISTOGRAM_BINS)
+        # Nilai maksimum masuk bin terakhir (seperti np.histogram); NaN jatuh ke index HISTOGRAM_BINS
+        idx = np.searchsorted(col_edges, values, side='right') - 1
+        idx[values == col_edges[-1]] = HISTOGRAM_BINS - 1
+        edges[col] = col_edges
+        bin_index[col] = idx.astype(np.int8)
+    return edges, bin_index
+
+histogram_edges, histogram_bins = build_histogram_bins(rfm)
+
+# Agregat per cluster dihitung sekali; header & kartu metrik cukup membaca tabel kecil ini
+@st.cache_resource
+def summarize_clusters(_rfm):
+    return _rfm.groupby('Cluster_KMeans', sort=False).agg(
+        Count=('Cluster_KMeans', 'size'),
+        Revenue=('Monetary', 'sum'),
+        AvgOrderValueSum=('AvgOrderValue', 'sum')
+    )
+
+cluster_stats = summarize_clusters(rfm)
+
+# Batas (dan nilai default) slider filter, dihitung sekali (bukan min/max ulang di setiap rerun)
+@st.cache_resource
+def compute_slider_bounds(_rfm):
+    return {
+        'RFM_Score': (int(_rfm['RFM_Score'].min()), int(_rfm['RFM_Score'].max())),
+        'Monetary': (float(_rfm['Monetary'].min()), float(_rfm['Monetary'].max())),
+        'Frequency': (int(_rfm['Frequency'].min()), int(_rfm['Frequency'].max())),
+        'Recency': (int(_rfm['Recency'].min()), int(_rfm['Recency'].max()))
+    }
+
+slider_bounds = compute_slider_bounds(rfm)
 
 # CSS Custom untuk Streamlit yang lebih modern
-st.markdown("""
+APP_CSS = """
 <style>
     * {margin: 0; padding: 0; box-sizing: border-box}
     body {font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #0f172a; min-height: 100vh}
@@ -258,270 +460,228 @@ st.markdown("""
     div[data-testid="stSlider"] > div {background: rgba(30, 41, 59, 0.8)}
     .stSlider > div > div > div {background: linear-gradient(90deg, #667eea, #764ba2)}
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# CSS diminify sekali per proses (komentar & whitespace dibuang), jadi payload yang dikirim tiap rerun lebih kecil
+@st.cache_resource
+def minify_css(css):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{};,>])\s*|(:)\s+', r'\1\2', css).strip()
+
+st.markdown(minify_css(APP_CSS), unsafe_allow_html=True)
+
+# Batas jumlah titik yang dikirim ke browser untuk 3D scatter
+SCATTER_SAMPLE_SIZE = 500
+
+# Sampel berstrata per cluster dengan total titik tetap: cluster kecil diambil semua, sisa jatahnya
+# dibagi rata ke cluster yang lebih besar. clusters harus terurut (tiap cluster satu blok baris).
+def stratified_sample_index(clusters, total, seed=42):
+    rng = np.random.default_rng(seed)
+    groups = np.split(np.arange(len(clusters)), np.flatnonzero(np.diff(clusters)) + 1)
+    
+    remaining = total
+    picks = []
+    for i, group in enumerate(sorted(groups, key=len)):
+        take = min(len(group), remaining // (len(groups) - i))
+        picks.append(rng.choice(group, take, replace=False))
+        remaining -= take
+    
+    return np.sort(np.concatenate(picks))
+
+# Potongan layout statis yang dipakai ulang semua chart, dibuat sekali saat import
+TRANSPARENT_BG = dict(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
+GRID_AXIS = dict(gridcolor='rgba(255,255,255,0.1)', tickfont=dict(color='white'))
+SCENE_AXIS = dict(gridcolor='rgba(255,255,255,0.1)', backgroundcolor='rgba(0,0,0,0)')
+
+# Figure kosong untuk chart yang datanya tidak tersedia: dibangun sekali per judul/pesan lalu dipakai ulang.
+# cache_resource (bukan functools.lru_cache): fungsi di skrip dibuat ulang tiap rerun, jadi lru_cache selalu kosong
+@st.cache_resource(max_entries=32)
+def placeholder_figure(title, height, title_size=16, message=None, message_size=14):
+    annotations = [dict(
+        text=message,
+        x=0.5, y=0.5,
+        showarrow=False,
+        font=dict(color='white', size=message_size)
+    )] if message else []
+    return go.Figure(layout=dict(
+        title=dict(text=title, font=dict(color='white', size=title_size)),
+        height=height,
+        **TRANSPARENT_BG,
+        annotations=annotations
+    ))
 
 # Fungsi untuk membuat chart yang lebih modern
-def create_charts(df):
+# Layout diberikan langsung ke konstruktor go.Figure supaya validasi Plotly hanya jalan sekali per figure
+def create_charts(cols, codes):
+    # Jumlah customer per segmen: satu np.bincount di atas kode label, bukan value_counts/groupby
+    counts = np.bincount(codes, minlength=len(label_names))
+    present = np.flatnonzero(counts)
+    segment_names = label_names[present]
+    
     # Chart 1: Customer Distribution Donut
-    cc = df['Cluster_Label'].value_counts()
-    
-    fig1 = go.Figure(go.Pie(
-        labels=cc.index, 
-        values=cc.values, 
-        hole=0.6,
-        marker=dict(
-            colors=[colors.get(l, '#64748b') for l in cc.index],
-            line=dict(color='#0f172a', width=2)
-        ),
-        textinfo='label+percent',
-        hoverinfo='label+value+percent',
-        textfont=dict(color='white'),
-        insidetextorientation='radial'
-    ))
-    fig1.update_layout(
-        title=dict(
-            text="🎯 Customer Distribution",
-            font=dict(color='white', size=16),
-            x=0.5
-        ),
-        height=400,
-        showlegend=True,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        legend=dict(
-            font=dict(color='white'),
-            orientation='h',
-            yanchor='bottom',
-            y=-0.2,
-            xanchor='center',
-            x=0.5
+    def distribution_chart():
+        return go.Figure(
+            data=[go.Pie(
+                labels=segment_names, 
+                values=counts[present].astype(np.int32), 
+                hole=0.6,
+                marker=dict(
+                    colors=label_colors[present],
+                    line=dict(color='#0f172a', width=2)
+                ),
+                textinfo='label+percent',
+                hoverinfo='label+value+percent',
+                textfont=dict(color='white'),
+                insidetextorientation='radial'
+            )],
+            layout=dict(
+                title=dict(
+                    text="🎯 Customer Distribution",
+                    font=dict(color='white', size=16),
+                    x=0.5
+                ),
+                height=400,
+                showlegend=True,
+                uirevision='const',
+                **TRANSPARENT_BG,
+                legend=dict(
+                    font=dict(color='white'),
+                    orientation='h',
+                    yanchor='bottom',
+                    y=-0.2,
+                    xanchor='center',
+                    x=0.5
+                )
+            )
         )
-    )
     
     # Chart 2: Revenue by Segment
-    if 'Monetary' in df.columns:
-        rv = df.groupby('Cluster_Label')['Monetary'].sum().sort_values()
-        
-        fig2 = go.Figure(go.Bar(
-            x=rv.values, 
-            y=rv.index, 
-            orientation='h',
-            marker=dict(
-                color=rv.values,
-                colorscale='Viridis',
-                line=dict(color='#0f172a', width=1)
-            ),
-            text=[f'£{v/1000:.1f}K' for v in rv.values],
-            textposition='outside',
-            textfont=dict(color='white')
-        ))
-        fig2.update_layout(
-            title=dict(
-                text="💰 Revenue by Segment",
-                font=dict(color='white', size=16),
-                x=0.5
-            ),
-            xaxis=dict(
-                title=dict(text="Revenue (£)", font=dict(color='white')),
-                gridcolor='rgba(255,255,255,0.1)',
-                tickfont=dict(color='white')
-            ),
-            yaxis=dict(
-                tickfont=dict(color='white')
-            ),
-            height=400,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)'
-        )
-    else:
-        fig2 = go.Figure()
-        fig2.update_layout(
-            title=dict(text="💰 Revenue by Segment", font=dict(color='white', size=16)),
-            height=400,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            annotations=[dict(
-                text='No revenue data',
-                x=0.5, y=0.5,
-                showarrow=False,
-                font=dict(color='white', size=14)
-            )]
-        )
+    def revenue_chart():
+        if 'Monetary' in cols:
+            revenue = np.bincount(codes, weights=cols['Monetary'], minlength=len(label_names))[present]
+            order = np.argsort(revenue)
+            # Hanya payload x/warna yang dibulatkan ke integer; label K tetap dari jumlah asli (tanpa pembulatan ganda)
+            rv_values = np.rint(revenue[order]).astype(np.int64)
+            
+            return go.Figure(
+                data=[go.Bar(
+                    x=rv_values, 
+                    y=segment_names[order], 
+                    orientation='h',
+                    marker=dict(
+                        color=rv_values,
+                        colorscale='Viridis',
+                        line=dict(color='#0f172a', width=1)
+                    ),
+                    text=[f'£{v/1000:.1f}K' for v in revenue[order]],
+                    textposition='outside',
+                    textfont=dict(color='white')
+                )],
+                layout=dict(
+                    title=dict(
+                        text="💰 Revenue by Segment",
+                        font=dict(color='white', size=16),
+                        x=0.5
+                    ),
+                    xaxis=dict(title=dict(text="Revenue (£)", font=dict(color='white')), **GRID_AXIS),
+                    yaxis=dict(
+                        tickfont=dict(color='white')
+                    ),
+                    height=400,
+                    uirevision='const',
+                    **TRANSPARENT_BG
+                )
+            )
+        else:
+            return placeholder_figure("💰 Revenue by Segment", 400, message='No revenue data')
     
     # Chart 3: 3D RFM Analysis dengan tema gelap
-    if all(col in df.columns for col in ['Recency', 'Frequency', 'Monetary']):
-        fig3 = go.Figure(go.Scatter3d(
-            x=df['Recency'], 
-            y=df['Frequency'], 
-            z=df['Monetary'],
-            mode='markers',
-            marker=dict(
-                size=6,
-                color=df['Cluster_KMeans'],
-                colorscale='Rainbow',
-                opacity=0.8,
-                line=dict(width=0)
-            ),
-            text=df['Cluster_Label'],
-            hovertemplate='<b>%{text}</b><br>' +
-                         'Recency: %{x}d<br>' +
-                         'Frequency: %{y}<br>' +
-                         'Monetary: £%{z:.0f}<br>' +
-                         '<extra></extra>'
-        ))
-        fig3.update_layout(
-            title=dict(
-                text="📈 3D RFM Analysis",
-                font=dict(color='white', size=16),
-                x=0.5
-            ),
-            height=600,
-            scene=dict(
-                xaxis=dict(
-                    title='Recency (days)',
-                    gridcolor='rgba(255,255,255,0.1)',
-                    backgroundcolor='rgba(0,0,0,0)'
-                ),
-                yaxis=dict(
-                    title='Frequency',
-                    gridcolor='rgba(255,255,255,0.1)',
-                    backgroundcolor='rgba(0,0,0,0)'
-                ),
-                zaxis=dict(
-                    title='Monetary (£)',
-                    gridcolor='rgba(255,255,255,0.1)',
-                    backgroundcolor='rgba(0,0,0,0)'
-                ),
-                bgcolor='rgba(0,0,0,0)'
-            ),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
-        )
-    else:
-        fig3 = go.Figure()
-        fig3.update_layout(
-            title=dict(text="📈 3D RFM Analysis", font=dict(color='white', size=16)),
-            height=600,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)'
-        )
+    def scatter_chart():
+        if all(col in cols for col in ['Recency', 'Frequency', 'Monetary']):
+            # Satu index sampel dipakai untuk semua kolom supaya x/y/z/warna tetap satu baris yang sama
+            idx = stratified_sample_index(cols['Cluster_KMeans'], SCATTER_SAMPLE_SIZE)
+            
+            x, y, z = (cols[col][idx] for col in ('Recency', 'Frequency', 'Monetary'))
+            # Baris sudah urut per cluster, jadi tiap segmen adalah potongan kontigu dari sampel;
+            # satu trace per segmen dengan warna diskrit menggantikan colorscale dan array teks per titik
+            sample_codes = codes[idx]
+            starts = np.flatnonzero(np.diff(sample_codes, prepend=-1))
+            ends = np.r_[starts[1:], len(sample_codes)]
+            
+            return go.Figure(
+                data=[go.Scatter3d(
+                    x=x[start:end], 
+                    y=y[start:end], 
+                    z=z[start:end],
+                    mode='markers',
+                    name=label_names[sample_codes[start]],
+                    marker=dict(
+                        size=6,
+                        color=label_colors[sample_codes[start]],
+                        opacity=0.8,
+                        line=dict(width=0)
+                    ),
+                    hovertemplate='<b>%{fullData.name}</b><br>' +
+                                 'Recency: %{x}d<br>' +
+                                 'Frequency: %{y}<br>' +
+                                 'Monetary: £%{z:.0f}<br>' +
+                                 '<extra></extra>'
+                ) for start, end in zip(starts, ends)],
+                layout=dict(
+                    title=dict(
+                        text="📈 3D RFM Analysis",
+                        font=dict(color='white', size=16),
+                        x=0.5
+                    ),
+                    height=600,
+                    legend=dict(font=dict(color='white')),
+                    scene=dict(
+                        xaxis=dict(title='Recency (days)', **SCENE_AXIS),
+                        yaxis=dict(title='Frequency', **SCENE_AXIS),
+                        zaxis=dict(title='Monetary (£)', **SCENE_AXIS),
+                        bgcolor='rgba(0,0,0,0)'
+                    ),
+                    **TRANSPARENT_BG
+                )
+            )
+        else:
+            return placeholder_figure("📈 3D RFM Analysis", 600)
     
     # Chart 4-6: Histograms dengan tema gelap
-    def create_histogram(df, column, title, color):
-        if column not in df.columns:
-            fig = go.Figure()
-            fig.update_layout(
+    def create_histogram(column, title, color):
+        if column not in cols:
+            return placeholder_figure(title, 300, title_size=14)
+        
+        # Batas bin tetap (dihitung dari data penuh), jadi per filter cukup menghitung index bin yang sudah jadi;
+        # bin ekstra terakhir menampung NaN dan dibuang
+        edges = histogram_edges[column]
+        bin_counts = np.bincount(cols[f'{column}_bin'], minlength=HISTOGRAM_BINS + 1)[:HISTOGRAM_BINS]
+        
+        return go.Figure(
+            data=[go.Bar(
+                x=(edges[:-1] + edges[1:]) / 2,
+                y=bin_counts,
+                customdata=np.column_stack([edges[:-1], edges[1:]]),
+                hovertemplate='%{customdata[0]:.0f} - %{customdata[1]:.0f}<br>Count: %{y}<extra></extra>',
+                marker_color=color,
+                opacity=0.8,
+                marker_line_color='#0f172a',
+                marker_line_width=1
+            )],
+            layout=dict(
                 title=dict(text=title, font=dict(color='white', size=14)),
                 height=300,
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)'
+                bargap=0.1,
+                xaxis=GRID_AXIS,
+                yaxis=GRID_AXIS,
+                **TRANSPARENT_BG
             )
-            return fig
-        
-        fig = go.Figure(go.Histogram(
-            x=df[column],
-            nbinsx=30,
-            marker_color=color,
-            opacity=0.8,
-            marker_line_color='#0f172a',
-            marker_line_width=1
-        ))
-        fig.update_layout(
-            title=dict(text=title, font=dict(color='white', size=14)),
-            height=300,
-            bargap=0.1,
-            xaxis=dict(
-                gridcolor='rgba(255,255,255,0.1)',
-                tickfont=dict(color='white')
-            ),
-            yaxis=dict(
-                gridcolor='rgba(255,255,255,0.1)',
-                tickfont=dict(color='white')
-            ),
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)'
         )
-        return fig
-    
-    fig4 = create_histogram(df, 'Recency', '⏰ Recency Distribution', '#FF6B6B')
-    fig5 = create_histogram(df, 'Frequency', '🔄 Frequency Distribution', '#4ECDC4')
-    fig6 = create_histogram(df, 'Monetary', '💵 Monetary Distribution', '#45B7D1')
     
     # Chart 7: RFM Table - versi yang diperbaiki
-    try:
-        segment_counts = df.groupby('Cluster_Label').size().reset_index(name='Count')
-        
-        if all(col in df.columns for col in ['Recency', 'Frequency', 'Monetary', 'AvgOrderValue', 'RFM_Score']):
-            rfm_stats = df.groupby('Cluster_Label').agg({
-                'Recency': 'mean',
-                'Frequency': 'mean', 
-                'Monetary': 'mean',
-                'AvgOrderValue': 'mean',
-                'RFM_Score': 'mean'
-            }).round(1).reset_index()
-            
-            segment_table = pd.merge(segment_counts, rfm_stats, on='Cluster_Label')
-            
-            segment_table['Recency'] = segment_table['Recency'].apply(lambda x: f"{x:.0f}d")
-            segment_table['Frequency'] = segment_table['Frequency'].apply(lambda x: f"{x:.1f}")
-            segment_table['Monetary'] = segment_table['Monetary'].apply(lambda x: f"£{x:,.0f}")
-            segment_table['AvgOrderValue'] = segment_table['AvgOrderValue'].apply(lambda x: f"£{x:.0f}")
-            segment_table['RFM_Score'] = segment_table['RFM_Score'].apply(lambda x: f"{x:.1f}")
-            
-            segment_table = segment_table[['Cluster_Label', 'Count', 'Recency', 'Frequency', 
-                                         'Monetary', 'AvgOrderValue', 'RFM_Score']]
-            
-            fig7 = go.Figure(data=[go.Table(
-                header=dict(
-                    values=['<b>Segment</b>', '<b>Count</b>', '<b>Recency</b>', '<b>Frequency</b>',
-                            '<b>Monetary</b>', '<b>Avg Order</b>', '<b>RFM Score</b>'],
-                    fill_color='#1e293b',
-                    align='center',
-                    font=dict(color='white', size=12),
-                    height=40,
-                    line=dict(color='#334155')
-                ),
-                cells=dict(
-                    values=[
-                        segment_table['Cluster_Label'],
-                        segment_table['Count'],
-                        segment_table['Recency'],
-                        segment_table['Frequency'],
-                        segment_table['Monetary'],
-                        segment_table['AvgOrderValue'],
-                        segment_table['RFM_Score']
-                    ],
-                    fill_color=['rgba(30, 41, 59, 0.6)', 'rgba(30, 41, 59, 0.4)'],
-                    align='center',
-                    font=dict(size=11, color='white'),
-                    height=35,
-                    line=dict(color='#334155')
-                )
-            )])
-        else:
-            segment_table = segment_counts.copy()
-            segment_table = segment_table.rename(columns={'Cluster_Label': 'Segment'})
-            
-            fig7 = go.Figure(data=[go.Table(
-                header=dict(
-                    values=['<b>Segment</b>', '<b>Count</b>'],
-                    fill_color='#1e293b',
-                    align='center',
-                    font=dict(color='white', size=12),
-                    height=40,
-                    line=dict(color='#334155')
-                ),
-                cells=dict(
-                    values=[segment_table['Segment'], segment_table['Count']],
-                    fill_color=['rgba(30, 41, 59, 0.6)', 'rgba(30, 41, 59, 0.4)'],
-                    align='center',
-                    font=dict(size=11, color='white'),
-                    height=35,
-                    line=dict(color='#334155')
-                )
-            )])
-        
-        fig7.update_layout(
+    def summary_table():
+        table_layout = dict(
             title=dict(
                 text="📊 Segment Summary",
                 font=dict(color='white', size=16),
@@ -529,26 +689,203 @@ def create_charts(df):
             ),
             height=400,
             margin=dict(t=50, b=20, l=20, r=20),
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)'
+            **TRANSPARENT_BG
         )
         
-    except Exception as e:
-        fig7 = go.Figure()
-        fig7.update_layout(
-            title=dict(text="📊 Segment Summary", font=dict(color='white', size=16)),
-            height=400,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            annotations=[dict(
-                text=f'Error: {str(e)[:100]}',
-                x=0.5, y=0.5,
-                showarrow=False,
-                font=dict(size=12, color='white')
-            )]
-        )
+        try:
+            stat_cols = ['Recency', 'Frequency', 'Monetary', 'AvgOrderValue', 'RFM_Score']
+            
+            if all(col in cols for col in stat_cols):
+                # Rata-rata per segmen = np.bincount berbobot / jumlah, satu pass C per kolom tanpa groupby
+                segment_table = pd.DataFrame({
+                    'Cluster_Label': segment_names,
+                    'Count': counts[present],
+                    **{
+                        col: np.bincount(codes, weights=cols[col], minlength=len(label_names))[present] / counts[present]
+                        for col in stat_cols
+                    }
+                }).round(1)
+                
+                segment_table['Recency'] = segment_table['Recency'].map("{:.0f}d".format)
+                segment_table['Frequency'] = segment_table['Frequency'].map("{:.1f}".format)
+                segment_table['Monetary'] = segment_table['Monetary'].map("£{:,.0f}".format)
+                segment_table['AvgOrderValue'] = segment_table['AvgOrderValue'].map("£{:.0f}".format)
+                segment_table['RFM_Score'] = segment_table['RFM_Score'].map("{:.1f}".format)
+                
+                return go.Figure(
+                    data=[go.Table(
+                        header=dict(
+                            values=['<b>Segment</b>', '<b>Count</b>', '<b>Recency</b>', '<b>Frequency</b>',
+                                    '<b>Monetary</b>', '<b>Avg Order</b>', '<b>RFM Score</b>'],
+                            fill_color='#1e293b',
+                            align='center',
+                            font=dict(color='white', size=12),
+                            height=40,
+                            line=dict(color='#334155')
+                        ),
+                        cells=dict(
+                            values=[
+                                segment_table['Cluster_Label'],
+                                segment_table['Count'],
+                                segment_table['Recency'],
+                                segment_table['Frequency'],
+                                segment_table['Monetary'],
+                                segment_table['AvgOrderValue'],
+                                segment_table['RFM_Score']
+                            ],
+                            fill_color=['rgba(30, 41, 59, 0.6)', 'rgba(30, 41, 59, 0.4)'],
+                            align='center',
+                            font=dict(size=11, color='white'),
+                            height=35,
+                            line=dict(color='#334155')
+                        )
+                    )],
+                    layout=table_layout
+                )
+            else:
+                segment_table = pd.DataFrame({'Segment': segment_names, 'Count': counts[present]})
+                
+                return go.Figure(
+                    data=[go.Table(
+                        header=dict(
+                            values=['<b>Segment</b>', '<b>Count</b>'],
+                            fill_color='#1e293b',
+                            align='center',
+                            font=dict(color='white', size=12),
+                            height=40,
+                            line=dict(color='#334155')
+                        ),
+                        cells=dict(
+                            values=[segment_table['Segment'], segment_table['Count']],
+                            fill_color=['rgba(30, 41, 59, 0.6)', 'rgba(30, 41, 59, 0.4)'],
+                            align='center',
+                            font=dict(size=11, color='white'),
+                            height=35,
+                            line=dict(color='#334155')
+                        )
+                    )],
+                    layout=table_layout
+                )
+        
+        except Exception as e:
+            return placeholder_figure("📊 Segment Summary", 400, message=f'Error: {str(e)[:100]}', message_size=12)
+    
+    return (
+        distribution_chart(),
+        revenue_chart(),
+        scatter_chart(),
+        create_histogram('Recency', '⏰ Recency Distribution', '#FF6B6B'),
+        create_histogram('Frequency', '🔄 Frequency Distribution', '#4ECDC4'),
+        create_histogram('Monetary', '💵 Monetary Distribution', '#45B7D1'),
+        summary_table()
+    )
+
+# Gabungkan semua filter jadi satu boolean mask NumPy; range None berarti filter tidak aktif
+def filter_mask(segment, rfm_range, priority, monetary_range=None, frequency_range=None, recency_range=None):
+    # Filter segmen hanya membatasi slice baris cluster tersebut, filter lain cukup dicek di dalam slice itu
+    start, stop = (0, len(rfm)) if segment == 'all' else cluster_bounds.get(segment, (0, 0))
+    window = slice(start, stop)
+    window_mask = np.ones(stop - start, dtype=bool)
+    
+    if 'RFM_Score' in rfm.columns:
+        score = arrays['RFM_Score'][window]
+        window_mask &= (score >= rfm_range[0]) & (score <= rfm_range[1])
+    
+    if priority != 'all' and 'Priority' in rfm.columns:
+        window_mask &= arrays['priority_codes'][window] == priority_codes.get(priority, -1)
+    
+    for col, value_range in (('Monetary', monetary_range), ('Frequency', frequency_range), ('Recency', recency_range)):
+        if value_range is not None and col in rfm.columns:
+            values = arrays[col][window]
+            window_mask &= (values >= value_range[0]) & (values <= value_range[1])
+    
+    mask = np.zeros(len(rfm), dtype=bool)
+    mask[window] = window_mask
+    return mask
+
+# Figure di-cache per kombinasi filter, jadi kombinasi yang sudah pernah dipilih tidak membangun ulang chart.
+# Jumlah entri dibatasi supaya kombinasi slider yang tak terbatas tidak menumpuk di memori server.
+# cache_resource (bukan cache_data): figure hanya dibaca saat diserialisasi, jadi objek yang sama dipakai ulang
+# tanpa unpickle + validasi ulang 7 go.Figure di setiap rerun
+@st.cache_resource(max_entries=256)
+def compute_figures(segment, rfm_range, priority, monetary_range=None, frequency_range=None, recency_range=None):
+    mask = filter_mask(segment, rfm_range, priority, monetary_range, frequency_range, recency_range)
+    # Chart cukup menerima potongan ndarray per kolom; tidak perlu membangun DataFrame terfilter
+    return create_charts(
+        {
+            **{col: arrays[col][mask] for col in CHART_COLUMNS},
+            **{f'{col}_bin': bins[mask] for col, bins in histogram_bins.items()}
+        },
+        arrays['label_codes'][mask]
+    )
+
+# Body st.expander selalu dieksekusi (walau tertutup), jadi describe() Data Summary di-cache per state filter
+@st.cache_data(max_entries=256)
+def describe_filtered(segment, rfm_range, priority, monetary_range=None, frequency_range=None, recency_range=None):
+    mask = filter_mask(segment, rfm_range, priority, monetary_range, frequency_range, recency_range)
+    return load_summary_data(rfm)[mask].describe()
+
+# Kolom yang dijumlahkan per segmen untuk insight; rata-rata = jumlah / count
+INSIGHT_SUM_COLUMNS = ('Monetary', 'AvgOrderValue', 'Frequency', 'Recency')
+
+def segment_sums(codes, mask):
+    return np.vstack([np.bincount(codes, minlength=len(label_names))] + [
+        np.bincount(codes, weights=arrays[col][mask], minlength=len(label_names))
+        for col in INSIGHT_SUM_COLUMNS
+    ])
+
+# Insight tab3 di-cache per kombinasi filter seperti compute_figures: filter + agregasi hanya jalan
+# sekali per state filter
+@st.cache_data(max_entries=256)
+def compute_insights(segment, rfm_range, priority, monetary_range=None, frequency_range=None, recency_range=None):
+    mask = filter_mask(segment, rfm_range, priority, monetary_range, frequency_range, recency_range)
+    n_rows = int(np.count_nonzero(mask))
+    insights = {
+        'highest_revenue_segment': "N/A", 'highest_revenue_value': 0,
+        'largest_group_segment': "N/A", 'largest_group_count': 0,
+        'best_aov_segment': "N/A", 'best_aov_value': 0,
+        'most_frequent_segment': "N/A", 'most_frequent_value': 0,
+        'segment_concentration': 0.0, 'revenue_concentration': None,
+        'avg_recency': None, 'avg_frequency': None
+    }
+    if n_rows == 0:
+        return insights
     
-    return fig1, fig2, fig3, fig4, fig5, fig6, fig7
+    # Jumlah, revenue & total per segmen lewat np.bincount di atas kode label, bukan groupby + value_counts
+    sums = segment_sums(arrays['label_codes'][mask], mask)
+    
+    present = np.flatnonzero(sums[0])
+    counts, revenue, aov_sum, frequency_sum, recency_sum = sums[:, present]
+    
+    highest = revenue.argmax()
+    insights['highest_revenue_segment'] = label_names[present[highest]]
+    insights['highest_revenue_value'] = float(revenue[highest])
+    
+    largest = counts.argmax()
+    insights['largest_group_segment'] = label_names[present[largest]]
+    insights['largest_group_count'] = int(counts[largest])
+    insights['segment_concentration'] = counts[largest] / n_rows * 100
+    
+    best_aov = aov_sum / counts
+    insights['best_aov_segment'] = label_names[present[best_aov.argmax()]]
+    insights['best_aov_value'] = float(best_aov.max())
+    
+    most_frequent = frequency_sum / counts
+    insights['most_frequent_segment'] = label_names[present[most_frequent.argmax()]]
+    insights['most_frequent_value'] = float(most_frequent.max())
+    
+    insights['avg_recency'] = float(recency_sum.sum() / counts.sum())
+    insights['avg_frequency'] = float(frequency_sum.sum() / counts.sum())
+    
+    # Revenue 20% customer teratas: np.partition cukup memisahkan top-k tanpa sort penuh
+    monetary = arrays['Monetary'][mask].astype(np.float64)
+    top_n = int(n_rows * 0.2)
+    top_20_revenue = np.partition(monetary, n_rows - top_n)[n_rows - top_n:].sum() if top_n else 0.0
+    total_revenue = monetary.sum()
+    if total_revenue > 0:
+        insights['revenue_concentration'] = float(top_20_revenue / total_revenue * 100)
+    
+    return insights
 
 # Sidebar
 with st.sidebar:
@@ -616,8 +953,8 @@ def main():
     </div>
     """.format(
         len(rfm),
-        rfm['Cluster_KMeans'].nunique(),
-        rfm['Monetary'].sum()/1e6 if 'Monetary' in rfm.columns else 0
+        len(cluster_stats),
+        cluster_stats['Revenue'].sum()/1e6
     ), unsafe_allow_html=True)
     
     # Metrics Grid
@@ -627,7 +964,6 @@ def main():
     
     with col1:
         total_customers = len(rfm)
-        segment_count = rfm['Cluster_KMeans'].nunique()
         st.markdown(f"""
         <div class="metric-card">
             <div class="metric-icon">👥</div>
@@ -640,8 +976,7 @@ def main():
         """, unsafe_allow_html=True)
     
     with col2:
-        total_rev = rfm['Monetary'].sum() if 'Monetary' in rfm.columns else 0
-        avg_rev = rfm['Monetary'].mean() if 'Monetary' in rfm.columns else 0
+        total_rev = cluster_stats['Revenue'].sum()
         st.markdown(f"""
         <div class="metric-card">
             <div class="metric-icon">💰</div>
@@ -654,8 +989,7 @@ def main():
         """, unsafe_allow_html=True)
     
     with col3:
-        avg_order = rfm['AvgOrderValue'].mean() if 'AvgOrderValue' in rfm.columns else 0
-        max_order = rfm['AvgOrderValue'].max() if 'AvgOrderValue' in rfm.columns else 0
+        avg_order = cluster_stats['AvgOrderValueSum'].sum() / len(rfm) if len(rfm) > 0 else 0
         st.markdown(f"""
         <div class="metric-card">
             <div class="metric-icon">📈</div>
@@ -668,7 +1002,7 @@ def main():
         """, unsafe_allow_html=True)
     
     with col4:
-        champion_count = len(rfm[rfm['Cluster_Label'].str.contains('Champions')]) if 'Cluster_Label' in rfm.columns else 0
+        champion_count = sum(cluster_stats.at[c, 'Count'] for c, p in profs.items() if p['key'] == 'champions')
         champion_pct = (champion_count / len(rfm) * 100) if len(rfm) > 0 else 0
         st.markdown(f"""
         <div class="metric-card">
@@ -690,18 +1024,10 @@ def main():
     col1, col2, col3 = st.columns(3)
     with col1:
         # Segment Filter
-        segment_options = [{'label': '🌐 All Segments', 'value': 'all'}]
-        for c, p in profs.items():
-            if p['name'] == '🏆 Champions' and c in champion_details:
-                label = f"{p['name']} - {champion_details[c]['tier']}"
-            else:
-                label = p['name']
-            segment_options.append({'label': label, 'value': c})
-        
         segment_filter = st.selectbox(
             "🎨 Segment Filter",
-            options=[opt['value'] for opt in segment_options],
-            format_func=lambda x: next((opt['label'] for opt in segment_options if opt['value'] == x), x),
+            options=list(SEGMENT_OPTIONS),
+            format_func=lambda x: SEGMENT_OPTIONS.get(x, x),
             index=0,
             key="segment_filter"
         )
@@ -709,8 +1035,7 @@ def main():
     with col2:
         # RFM Score Range
         if 'RFM_Score' in rfm.columns:
-            rfm_min = int(rfm['RFM_Score'].min())
-            rfm_max = int(rfm['RFM_Score'].max())
+            rfm_min, rfm_max = slider_bounds['RFM_Score']
             rfm_filter = st.slider(
                 "📊 RFM Score Range",
                 min_value=rfm_min,
@@ -730,17 +1055,10 @@ def main():
     
     with col3:
         # Priority Level
-        priority_options = [
-            {'label': '🌐 All Priorities', 'value': 'all'},
-            {'label': '🔴 CRITICAL', 'value': 'CRITICAL'},
-            {'label': '🔥 URGENT', 'value': 'URGENT'},
-            {'label': '⚡ HIGH', 'value': 'HIGH'},
-            {'label': '📊 MEDIUM', 'value': 'MEDIUM'}
-        ]
         priority_filter = st.selectbox(
             "🔥 Priority Level",
-            options=[opt['value'] for opt in priority_options],
-            format_func=lambda x: next((opt['label'] for opt in priority_options if opt['value'] == x), x),
+            options=list(PRIORITY_OPTIONS),
+            format_func=lambda x: PRIORITY_OPTIONS.get(x, x),
             index=0,
             key="priority_filter"
         )
@@ -750,8 +1068,7 @@ def main():
         col1, col2, col3 = st.columns(3)
         with col1:
             if 'Monetary' in rfm.columns:
-                monetary_min = float(rfm['Monetary'].min())
-                monetary_max = float(rfm['Monetary'].max())
+                monetary_min, monetary_max = slider_bounds['Monetary']
                 monetary_filter = st.slider(
                     "💰 Monetary Value Range",
                     min_value=monetary_min,
@@ -762,8 +1079,7 @@ def main():
         
         with col2:
             if 'Frequency' in rfm.columns:
-                freq_min = int(rfm['Frequency'].min())
-                freq_max = int(rfm['Frequency'].max())
+                freq_min, freq_max = slider_bounds['Frequency']
                 frequency_filter = st.slider(
                     "🔄 Frequency Range",
                     min_value=freq_min,
@@ -774,8 +1090,7 @@ def main():
         
         with col3:
             if 'Recency' in rfm.columns:
-                recency_min = int(rfm['Recency'].min())
-                recency_max = int(rfm['Recency'].max())
+                recency_min, recency_max = slider_bounds['Recency']
                 recency_filter = st.slider(
                     "⏰ Recency Range (days)",
                     min_value=recency_min,
@@ -786,47 +1101,26 @@ def main():
     
     st.markdown('</div>', unsafe_allow_html=True)
     
-    # Apply filters
-    filtered_df = rfm.copy()
-    
-    if 'RFM_Score' in rfm.columns:
-        filtered_df = filtered_df[
-            (filtered_df['RFM_Score'] >= rfm_filter[0]) & 
-            (filtered_df['RFM_Score'] <= rfm_filter[1])
-        ]
-    
-    if segment_filter != 'all':
-        filtered_df = filtered_df[filtered_df['Cluster_KMeans'] == segment_filter]
-    
-    if priority_filter != 'all' and 'Priority' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['Priority'] == priority_filter]
-    
-    # Apply advanced filters if they exist
-    if 'monetary_filter' in locals() and 'Monetary' in filtered_df.columns:
-        filtered_df = filtered_df[
-            (filtered_df['Monetary'] >= monetary_filter[0]) & 
-            (filtered_df['Monetary'] <= monetary_filter[1])
-        ]
-    
-    if 'frequency_filter' in locals() and 'Frequency' in filtered_df.columns:
-        filtered_df = filtered_df[
-            (filtered_df['Frequency'] >= frequency_filter[0]) & 
-            (filtered_df['Frequency'] <= frequency_filter[1])
-        ]
-    
-    if 'recency_filter' in locals() and 'Recency' in filtered_df.columns:
-        filtered_df = filtered_df[
-            (filtered_df['Recency'] >= recency_filter[0]) & 
-            (filtered_df['Recency'] <= recency_filter[1])
-        ]
+    # Apply filters (advanced filter yang tidak tampil dianggap tidak aktif)
+    filters = (
+        segment_filter,
+        tuple(rfm_filter),
+        priority_filter,
+        tuple(monetary_filter) if 'monetary_filter' in locals() else None,
+        tuple(frequency_filter) if 'frequency_filter' in locals() else None,
+        tuple(recency_filter) if 'recency_filter' in locals() else None
+    )
+    # Cukup mask boolean; DataFrame terfilter hanya dibangun di describe_filtered (di-cache) untuk Data Summary
+    mask = filter_mask(*filters)
+    has_rows = mask.any()
     
     # Tabs
     tab1, tab2, tab3 = st.tabs(["📊 Analytics Dashboard", "🎯 Growth Strategies", "💡 AI Insights"])
     
     with tab1:
-        if len(filtered_df) > 0:
+        if has_rows:
             # Generate charts
-            fig1, fig2, fig3, fig4, fig5, fig6, fig7 = create_charts(filtered_df)
+            fig1, fig2, fig3, fig4, fig5, fig6, fig7 = compute_figures(*filters)
             
             # Row 1: Two charts
             col1, col2 = st.columns(2)
@@ -870,7 +1164,7 @@ def main():
             # Data summary
             with st.expander("📋 Data Summary"):
                 st.dataframe(
-                    filtered_df.describe(),
+                    describe_filtered(*filters),
                     use_container_width=True
                 )
         else:
@@ -884,15 +1178,15 @@ def main():
     
     with tab2:
         # Champion Breakdown Section
-        champion_clusters = [c for c in filtered_df['Cluster_KMeans'].unique() 
-                            if c in profs and profs[c]['name'] == '🏆 Champions']
+        champion_clusters = [c for c in champion_cluster_ids
+                            if c in cluster_bounds and mask[slice(*cluster_bounds[c])].any()]
         
         if len(champion_clusters) > 0:
             st.markdown('<div class="champion-section">', unsafe_allow_html=True)
             st.markdown('<div class="champion-title">🏆 Champion Segments Breakdown</div>', unsafe_allow_html=True)
             
             cols = st.columns(2)
-            for idx, cid in enumerate(sorted(champion_clusters)):
+            for idx, cid in enumerate(champion_clusters):
                 if cid in champion_details:
                     det = champion_details[cid]
                     with cols[idx % 2]:
@@ -907,56 +1201,8 @@ def main():
             
             st.markdown('</div>', unsafe_allow_html=True)
         
-        # Strategy Cards
-        strategy_cards_html = ""
-        for cid, p in profs.items():
-            if segment_filter == 'all' or segment_filter == cid:
-                # Build tactics HTML
-                tactics_html = ""
-                for tactic in p['tactics']:
-                    tactics_html += f'<div class="tactic-item">{tactic}</div>'
-                
-                # Build KPIs HTML
-                kpis_html = ""
-                for kpi in p['kpis']:
-                    kpis_html += f'<div class="kpi-item">{kpi}</div>'
-                
-                strategy_cards_html += f"""
-                <div class="strategy-card" style="background: {p['grad']}">
-                    <div class="strategy-header">
-                        <div>
-                            <h3 class="strategy-name">{p['name']}</h3>
-                            <div class="strategy-subtitle">{p['strategy']} Strategy</div>
-                        </div>
-                        <div class="priority-badge">{p['priority']}</div>
-                    </div>
-                    
-                    <div class="tactics-section">
-                        <div class="tactics-title">🎯 Key Tactics</div>
-                        <div class="tactics-grid">
-                            {tactics_html}
-                        </div>
-                    </div>
-                    
-                    <div class="tactics-section">
-                        <div class="tactics-title">📊 Target KPIs</div>
-                        <div class="kpis-grid">
-                            {kpis_html}
-                        </div>
-                    </div>
-                    
-                    <div class="strategy-footer">
-                        <div class="budget-item">
-                            <div class="budget-label">Budget Allocation</div>
-                            <div class="budget-value">{p['budget']}</div>
-                        </div>
-                        <div class="budget-item">
-                            <div class="budget-label">Expected ROI</div>
-                            <div class="budget-value">{p['roi']}</div>
-                        </div>
-                    </div>
-                </div>
-                """
+        # Strategy Cards (HTML sudah dirender sekali per segmen saat startup)
+        strategy_cards_html = all_strategy_cards_html if segment_filter == 'all' else strategy_cards.get(segment_filter, "")
         
         if strategy_cards_html:
             st.markdown(f'<div class="strategy-grid">{strategy_cards_html}</div>', unsafe_allow_html=True)
@@ -970,45 +1216,8 @@ def main():
             """, unsafe_allow_html=True)
     
     with tab3:
-        if len(filtered_df) > 0:
-            # Calculate insights
-            if 'Cluster_Label' in filtered_df.columns:
-                if 'Monetary' in filtered_df.columns:
-                    highest_revenue = filtered_df.groupby('Cluster_Label')['Monetary'].sum()
-                    highest_revenue_segment = highest_revenue.idxmax() if not highest_revenue.empty else "N/A"
-                    highest_revenue_value = highest_revenue.max() if not highest_revenue.empty else 0
-                else:
-                    highest_revenue_segment = "N/A"
-                    highest_revenue_value = 0
-                
-                largest_group = filtered_df['Cluster_Label'].value_counts()
-                largest_group_segment = largest_group.idxmax() if not largest_group.empty else "N/A"
-                largest_group_count = largest_group.max() if not largest_group.empty else 0
-                
-                if 'AvgOrderValue' in filtered_df.columns:
-                    best_aov = filtered_df.groupby('Cluster_Label')['AvgOrderValue'].mean()
-                    best_aov_segment = best_aov.idxmax() if not best_aov.empty else "N/A"
-                    best_aov_value = best_aov.max() if not best_aov.empty else 0
-                else:
-                    best_aov_segment = "N/A"
-                    best_aov_value = 0
-                
-                if 'Frequency' in filtered_df.columns:
-                    most_frequent = filtered_df.groupby('Cluster_Label')['Frequency'].mean()
-                    most_frequent_segment = most_frequent.idxmax() if not most_frequent.empty else "N/A"
-                    most_frequent_value = most_frequent.max() if not most_frequent.empty else 0
-                else:
-                    most_frequent_segment = "N/A"
-                    most_frequent_value = 0
-            else:
-                highest_revenue_segment = "N/A"
-                highest_revenue_value = 0
-                largest_group_segment = "N/A"
-                largest_group_count = 0
-                best_aov_segment = "N/A"
-                best_aov_value = 0
-                most_frequent_segment = "N/A"
-                most_frequent_value = 0
+        if has_rows:
+            insights = compute_insights(*filters)
             
             st.markdown('<div class="insights-section">', unsafe_allow_html=True)
             st.markdown('<div class="insights-title">🧠 AI-Powered Insights & Recommendations</div>', unsafe_allow_html=True)
@@ -1023,10 +1232,10 @@ def main():
                 """, unsafe_allow_html=True)
                 
                 insights_list = [
-                    f"🏆 Highest Revenue: {highest_revenue_segment} (£{highest_revenue_value/1000:.1f}K)",
-                    f"👥 Largest Group: {largest_group_segment} ({largest_group_count:,} customers)",
-                    f"💰 Best AOV: {best_aov_segment} (£{best_aov_value:.0f})",
-                    f"🔄 Most Frequent: {most_frequent_segment} ({most_frequent_value:.1f} orders)"
+                    f"🏆 Highest Revenue: {insights['highest_revenue_segment']} (£{insights['highest_revenue_value']/1000:.1f}K)",
+                    f"👥 Largest Group: {insights['largest_group_segment']} ({insights['largest_group_count']:,} customers)",
+                    f"💰 Best AOV: {insights['best_aov_segment']} (£{insights['best_aov_value']:.0f})",
+                    f"🔄 Most Frequent: {insights['most_frequent_segment']} ({insights['most_frequent_value']:.1f} orders)"
                 ]
                 
                 for insight in insights_list:
@@ -1061,39 +1270,29 @@ def main():
                 with col1:
                     st.metric(
                         "📊 Segment Concentration",
-                        f"{(largest_group_count / len(filtered_df) * 100):.1f}%",
+                        f"{insights['segment_concentration']:.1f}%",
                         "+2.3%"
                     )
                     
-                    if 'Monetary' in filtered_df.columns:
-                        top_20_percent = filtered_df.nlargest(int(len(filtered_df) * 0.2), 'Monetary')
-                        bottom_80_percent = filtered_df.nsmallest(int(len(filtered_df) * 0.8), 'Monetary')
-                        
-                        top_20_revenue = top_20_percent['Monetary'].sum()
-                        total_revenue = filtered_df['Monetary'].sum()
-                        
-                        if total_revenue > 0:
-                            revenue_concentration = (top_20_revenue / total_revenue) * 100
-                            st.metric(
-                                "💰 Revenue Concentration (Top 20%)",
-                                f"{revenue_concentration:.1f}%",
-                                "+1.5%"
-                            )
+                    if insights['revenue_concentration'] is not None:
+                        st.metric(
+                            "💰 Revenue Concentration (Top 20%)",
+                            f"{insights['revenue_concentration']:.1f}%",
+                            "+1.5%"
+                        )
                 
                 with col2:
-                    if 'Recency' in filtered_df.columns:
-                        avg_recency = filtered_df['Recency'].mean()
+                    if insights['avg_recency'] is not None:
                         st.metric(
                             "⏰ Average Recency",
-                            f"{avg_recency:.1f} days",
+                            f"{insights['avg_recency']:.1f} days",
                             "-3.2 days"
                         )
                     
-                    if 'Frequency' in filtered_df.columns:
-                        avg_frequency = filtered_df['Frequency'].mean()
+                    if insights['avg_frequency'] is not None:
                         st.metric(
                             "🔄 Average Frequency",
-                            f"{avg_frequency:.1f}",
+                            f"{insights['avg_frequency']:.1f}",
                             "+0.8"
                         )
         else: